@@ -1,13 +1,33 @@
 from __future__ import annotations
 
 import os
+import sys
 import time
 import json
+import atexit
+import heapq
+import logging
+import logging.handlers
+import queue
 import math
-import urllib.request
+import re
+import signal
+import threading
 import urllib.parse
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional, Tuple
+from functools import partial
+from itertools import islice
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 
 # =========================
@@ -71,6 +91,8 @@ CONFIG = {
     # This is keyword scanning. Put "mention" or "trump" or "election" etc.
     "KALSHI_MARKET_QUERY": os.getenv("KALSHI_MARKET_QUERY", "mention").strip().lower(),
     "KALSHI_MARKETS_LIMIT": env_int("KALSHI_MARKETS_LIMIT", 80),
+    # Kept small: Kalshi's public API rate-limits reads per second
+    "KALSHI_ORDERBOOK_WORKERS": env_int("KALSHI_ORDERBOOK_WORKERS", 4),
 
     # Kalshi endpoints
     "KALSHI_ENV": os.getenv("KALSHI_ENV", "prod"),
@@ -107,10 +129,33 @@ TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID", "")
 DISCORD_WEBHOOK_URL = os.getenv("DISCORD_WEBHOOK_URL", "")
 
 
+# =========================
+# LOGGING
+# =========================
+log = logging.getLogger("openclaw")
+_log_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def setup_logging() -> None:
+    # Callers only enqueue records; formatting and the stdout write happen on the listener thread
+    global _log_listener
+    if _log_listener is not None:
+        return
+    q: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+    out = logging.StreamHandler(sys.stdout)
+    out.setFormatter(logging.Formatter("[%(asctime)s] %(message)s", "%Y-%m-%d %H:%M:%S"))
+    _log_listener = logging.handlers.QueueListener(q, out)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
+    log.addHandler(logging.handlers.QueueHandler(q))
+    log.setLevel(logging.INFO)
+    log.propagate = False
+
+
 # =========================
 # MODELS
 # =========================
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Signal:
     venue: str
     market_id: str
@@ -121,46 +166,74 @@ class Signal:
     confidence: float
     recommended_limit_price: float
     notes: str
+    # Cached fingerprint; still a field, so it shows up in asdict()/astuple() output
+    _fp: str = field(default="", init=False, repr=False, compare=False)
 
-    def fingerprint(self) -> str:
+    def __post_init__(self) -> None:
+        # Built once; should_send and notify both look it up
         # Rounded to avoid noise resends
-        return "|".join([
+        object.__setattr__(self, "_fp", "|".join([
             self.venue,
             self.market_id,
             self.side,
             f"{self.price:.3f}",
             f"{self.edge_hint:.3f}",
-        ])
+        ]))
+
+    def fingerprint(self) -> str:
+        return self._fp
 
 
 @dataclass
 class Memory:
-    sent_fingerprints: Dict[str, float] = field(default_factory=dict)
+    # Insertion order == send time, so the oldest entry is always first
+    sent_fingerprints: "OrderedDict[str, float]" = field(default_factory=OrderedDict)
     cycle_count: int = 0
 
     def log(self, msg: str) -> None:
-        ts = time.strftime("%Y-%m-%d %H:%M:%S")
-        print(f"[{ts}] {msg}", flush=True)
+        log.info(msg)
+
+
+# =========================
+# JSON HELPERS
+# =========================
+# orjson parses bytes directly and is several times faster; stdlib json is the fallback
+def json_loads(data: Any) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    if isinstance(data, (bytes, bytearray)):
+        data = data.decode("utf-8")
+    return json.loads(data)
+
+
+def json_dumps_bytes(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode("utf-8")
 
 
 # =========================
 # HTTP HELPERS
 # =========================
+# One pooled session for every Kalshi, Polymarket and webhook call so TCP+TLS is reused
+HTTP_SESSION = requests.Session()
+HTTP_SESSION.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=32))
+
+
 def http_get_json(url: str, headers: Optional[Dict[str, str]] = None, timeout: int = 30) -> Any:
-    req = urllib.request.Request(url, headers=headers or {}, method="GET")
-    with urllib.request.urlopen(req, timeout=timeout) as resp:
-        return json.loads(resp.read().decode("utf-8"))
+    resp = HTTP_SESSION.get(url, headers=headers or {}, timeout=timeout)
+    resp.raise_for_status()
+    return json_loads(resp.content)
 
 
 def http_post_json(url: str, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None, timeout: int = 30) -> Any:
-    body = json.dumps(payload).encode("utf-8")
+    body = json_dumps_bytes(payload)
     hdrs = {"Content-Type": "application/json"}
     if headers:
         hdrs.update(headers)
-    req = urllib.request.Request(url, data=body, headers=hdrs, method="POST")
-    with urllib.request.urlopen(req, timeout=timeout) as resp:
-        txt = resp.read().decode("utf-8")
-        return json.loads(txt) if txt else {"ok": True}
+    resp = HTTP_SESSION.post(url, data=body, headers=hdrs, timeout=timeout)
+    resp.raise_for_status()
+    return json_loads(resp.content) if resp.content else {"ok": True}
 
 
 # =========================
@@ -198,8 +271,8 @@ def clamp01(x: float) -> float:
 def confidence(edge_hint: float, liquidity_hint: float) -> float:
     edge_hint = max(0.0, float(edge_hint))
     liquidity_hint = clamp01(liquidity_hint)
-    c = (1.0 - math.exp(-7.0 * edge_hint)) * (0.35 + 0.65 * liquidity_hint)
-    return clamp01(c)
+    # -expm1(-x) == 1 - exp(-x); both factors are already in [0, 1], so the product needs no clamp
+    return -math.expm1(-7.0 * edge_hint) * (0.35 + 0.65 * liquidity_hint)
 
 
 def recommend_limit_price(current_price: float, edge_hint: float) -> float:
@@ -220,6 +293,13 @@ def parse_csv_keywords(s: str) -> List[str]:
     return [p for p in parts if p]
 
 
+def compile_keywords(keywords: List[str]) -> Optional["re.Pattern[str]"]:
+    # One alternation scans the text once in C instead of one substring test per keyword
+    if not keywords:
+        return None
+    return re.compile("|".join(re.escape(k) for k in keywords))
+
+
 def format_recap(signals: List[Signal], cycle: int) -> str:
     if not signals:
         return f"OpenClaw Recap (cycle {cycle}): No signals."
@@ -267,6 +347,14 @@ class KalshiClient:
 def best_bid_price_cents(levels: Any) -> Optional[int]:
     if not levels:
         return None
+
+    # Fast path for the usual [[price, size], ...] shape; anything odd takes the slow path
+    if isinstance(levels, list) and isinstance(levels[0], (list, tuple)):
+        try:
+            return max(int(lvl[0]) for lvl in levels)
+        except Exception:
+            pass
+
     best: Optional[int] = None
     for lvl in levels:
         price = None
@@ -283,6 +371,18 @@ def best_bid_price_cents(levels: Any) -> Optional[int]:
     return best
 
 
+def kalshi_candidates(markets: List[Dict[str, Any]], query: str) -> Iterator[Tuple[str, str]]:
+    # Yields (ticker, title) only for markets matching the keyword query
+    for m in markets:
+        title = str(m.get("title") or m.get("subtitle") or m.get("event_title") or "")
+        ticker = str(m.get("ticker") or m.get("market_ticker") or "")
+        if not ticker:
+            continue
+        if query and query not in (title + " " + ticker).lower():
+            continue
+        yield ticker, title
+
+
 # =========================
 # POLYMARKET (Gamma public)
 # =========================
@@ -306,11 +406,20 @@ class PolymarketClient:
 # =========================
 class OpenClawAgent:
     def __init__(self):
+        setup_logging()
         self.mem = Memory()
         self.kalshi = KalshiClient()
         self.poly = PolymarketClient()
         self.poly_include = parse_csv_keywords(CONFIG["POLY_INCLUDE_KEYWORDS"])
         self.poly_exclude = parse_csv_keywords(CONFIG["POLY_EXCLUDE_KEYWORDS"])
+        self.poly_include_re = compile_keywords(self.poly_include)
+        self.poly_exclude_re = compile_keywords(self.poly_exclude)
+        self.notify_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="notify")
+        self.orderbook_pool = ThreadPoolExecutor(
+            max_workers=max(1, CONFIG["KALSHI_ORDERBOOK_WORKERS"]), thread_name_prefix="kalshi-ob"
+        )
+        # Plain flag, not an Event: a signal handler must not take the Event's internal lock
+        self.stop_requested = False
 
     def plan(self) -> List[str]:
         steps: List[str] = []
@@ -324,9 +433,9 @@ class OpenClawAgent:
     def cleanup_dedup_cache(self) -> None:
         now = time.time()
         ttl = CONFIG["DEDUP_TTL_SEC"]
-        expired = [fp for fp, ts in self.mem.sent_fingerprints.items() if (now - ts) > ttl]
-        for fp in expired:
-            self.mem.sent_fingerprints.pop(fp, None)
+        cache = self.mem.sent_fingerprints
+        while cache and (now - next(iter(cache.values()))) > ttl:
+            cache.popitem(last=False)
 
     def should_send(self, signals: List[Signal]) -> List[Signal]:
         self.cleanup_dedup_cache()
@@ -339,20 +448,28 @@ class OpenClawAgent:
 
     def send_recap(self, recap: str) -> None:
         # Always log recap to console
-        print("\n" + recap + "\n", flush=True)
+        log.info("%s\n", recap)
 
+        # Post to both channels at once so the cycle waits for the slower one, not the sum
+        pending: List[Tuple[str, Any]] = []
         if CONFIG["SEND_TELEGRAM"]:
-            ok, msg = telegram_send(TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, recap)
-            self.mem.log(f"Telegram send ok={ok} detail={msg}")
+            pending.append(("Telegram", self.notify_pool.submit(telegram_send, TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, recap)))
 
         if CONFIG["SEND_DISCORD"]:
-            ok, msg = discord_send(DISCORD_WEBHOOK_URL, recap)
-            self.mem.log(f"Discord send ok={ok} detail={msg}")
+            pending.append(("Discord", self.notify_pool.submit(discord_send, DISCORD_WEBHOOK_URL, recap)))
+
+        for name, fut in pending:
+            ok, msg = fut.result()
+            self.mem.log(f"{name} send ok={ok} detail={msg}")
 
     def notify(self, signals: List[Signal]) -> None:
-        # Sort and cap
-        signals.sort(key=lambda s: (s.edge_hint, s.confidence), reverse=True)
-        signals = signals[: CONFIG["MAX_SIGNALS_TOTAL"]]
+        # Quiet cycles are the common case; skip the sort and dedup pass entirely
+        if not signals:
+            self.mem.log("Notify: no signals this cycle.")
+            return
+
+        # Top N by edge then confidence; same order as sort+slice without sorting everything
+        signals = heapq.nlargest(CONFIG["MAX_SIGNALS_TOTAL"], signals, key=lambda s: (s.edge_hint, s.confidence))
 
         to_send = self.should_send(signals)
         if not to_send:
@@ -367,11 +484,15 @@ class OpenClawAgent:
 
         now = time.time()
         for s in to_send:
-            self.mem.sent_fingerprints[s.fingerprint()] = now
+            fp = s.fingerprint()
+            self.mem.sent_fingerprints[fp] = now
+            self.mem.sent_fingerprints.move_to_end(fp)
 
     def scan_kalshi(self) -> List[Signal]:
         out: List[Signal] = []
         q = CONFIG["KALSHI_MARKET_QUERY"]
+        min_edge = CONFIG["MIN_EDGE_TO_REPORT"]
+        cap = CONFIG["MAX_SIGNALS_PER_VENUE"]
 
         try:
             data = self.kalshi.get_markets(CONFIG["KALSHI_MARKETS_LIMIT"])
@@ -382,19 +503,29 @@ class OpenClawAgent:
         markets = data.get("markets") or data.get("data") or []
         self.mem.log(f"Kalshi markets fetched: {len(markets)}")
 
-        for m in markets:
-            title = str(m.get("title") or m.get("subtitle") or m.get("event_title") or "")
-            ticker = str(m.get("ticker") or m.get("market_ticker") or "")
-            if not ticker:
-                continue
+        # Orderbook fetches are independent network calls, so keep a bounded window of them
+        # in flight and top it up from the keyword filter as each result is consumed.
+        # Results are consumed in market order so the per-venue cap picks the same markets.
+        candidates = kalshi_candidates(markets, q)
+        submit = partial(self.orderbook_pool.submit, self.kalshi.get_orderbook)
+        window = 2 * max(1, CONFIG["KALSHI_ORDERBOOK_WORKERS"])
+        ob_errors = 0
+        last_error = ""
+        pending: Deque[Tuple[str, str, Future]] = deque(
+            (ticker, title, submit(ticker)) for ticker, title in islice(candidates, window)
+        )
 
-            hay = (title + " " + ticker).lower()
-            if q and q not in hay:
-                continue
+        while pending:
+            ticker, title, fut = pending.popleft()
+            nxt = next(candidates, None)
+            if nxt is not None:
+                pending.append((*nxt, submit(nxt[0])))
 
             try:
-                ob = self.kalshi.get_orderbook(ticker)
-            except Exception:
+                ob = fut.result()
+            except Exception as e:
+                ob_errors += 1
+                last_error = str(e)
                 continue
 
             yes_levels = ob.get("orderbook", {}).get("yes") or ob.get("yes") or []
@@ -407,7 +538,7 @@ class OpenClawAgent:
 
             total = best_yes + best_no
             gap = abs(100 - total) / 100.0
-            if gap < CONFIG["MIN_EDGE_TO_REPORT"]:
+            if gap < min_edge:
                 continue
 
             yes_price = best_yes / 100.0
@@ -435,10 +566,16 @@ class OpenClawAgent:
                 notes=f"BestYesBid={best_yes}c BestNoBid={best_no}c Sum={total}c"
             ))
 
-            if len(out) >= CONFIG["MAX_SIGNALS_PER_VENUE"]:
+            if len(out) >= cap:
+                for _, _, rest in pending:
+                    rest.cancel()
                 break
 
-        self.mem.log(f"Kalshi signals: {len(out)}")
+        # Failed fetches (429s, timeouts) drop markets from the scan, so make them visible
+        if ob_errors:
+            self.mem.log(f"Kalshi signals: {len(out)} orderbook_errors={ob_errors} last_error={last_error}")
+        else:
+            self.mem.log(f"Kalshi signals: {len(out)}")
         return out
 
     def poly_title_passes(self, title: str) -> bool:
@@ -447,19 +584,16 @@ class OpenClawAgent:
             return False
 
         # Exclude first
-        for bad in self.poly_exclude:
-            if bad and bad in t:
-                return False
+        if self.poly_exclude_re is not None and self.poly_exclude_re.search(t):
+            return False
 
         # Include if any include keyword is present
-        for good in self.poly_include:
-            if good and good in t:
-                return True
-
-        return False
+        return self.poly_include_re is not None and self.poly_include_re.search(t) is not None
 
     def scan_polymarket(self) -> List[Signal]:
         out: List[Signal] = []
+        min_edge = CONFIG["MIN_EDGE_TO_REPORT"]
+        cap = CONFIG["MAX_SIGNALS_PER_VENUE"]
         try:
             markets = self.poly.get_markets(CONFIG["POLY_MARKETS_LIMIT"], 0)
         except Exception as e:
@@ -479,8 +613,8 @@ class OpenClawAgent:
             try:
                 prices_raw = m.get("outcomePrices")
                 outcomes_raw = m.get("outcomes")
-                prices = json.loads(prices_raw) if isinstance(prices_raw, str) else prices_raw
-                outcomes = json.loads(outcomes_raw) if isinstance(outcomes_raw, str) else outcomes_raw
+                prices = json_loads(prices_raw) if isinstance(prices_raw, str) else prices_raw
+                outcomes = json_loads(outcomes_raw) if isinstance(outcomes_raw, str) else outcomes_raw
                 if not prices or not outcomes or len(prices) < 2:
                     continue
                 yes_price = float(prices[0])
@@ -489,7 +623,7 @@ class OpenClawAgent:
                 continue
 
             imbalance = abs(yes_price - no_price)
-            if imbalance < CONFIG["MIN_EDGE_TO_REPORT"]:
+            if imbalance < min_edge:
                 continue
 
             # prefer orderbook enabled markets with higher liquidity hint
@@ -517,7 +651,7 @@ class OpenClawAgent:
                 notes=f"Yes={yes_price:.3f} No={no_price:.3f} enableOrderBook={enable_ob}"
             ))
 
-            if len(out) >= CONFIG["MAX_SIGNALS_PER_VENUE"]:
+            if len(out) >= cap:
                 break
 
         self.mem.log(f"Polymarket signals: {len(out)}")
@@ -530,10 +664,30 @@ class OpenClawAgent:
         self.mem.log("Startup test ping sending.")
         self.send_recap(msg)
 
+    def install_signal_handlers(self) -> None:
+        # SIGTERM on redeploy/scale-down ends the idle wait instead of killing a scan midway
+        if threading.current_thread() is not threading.main_thread():
+            return
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, self._request_stop)
+
+    def _request_stop(self, *_: Any) -> None:
+        self.stop_requested = True
+
+    def idle(self, seconds: float) -> None:
+        # Short sleeps so a stop request is noticed within a second
+        deadline = time.monotonic() + seconds
+        while not self.stop_requested:
+            left = deadline - time.monotonic()
+            if left <= 0:
+                return
+            time.sleep(min(1.0, left))
+
     def run_forever(self) -> None:
+        self.install_signal_handlers()
         self.startup_test()
 
-        while True:
+        while not self.stop_requested:
             self.mem.cycle_count += 1
             cycle = self.mem.cycle_count
 
@@ -565,7 +719,11 @@ class OpenClawAgent:
             except Exception as e:
                 self.mem.log(f"Top level cycle error: {e}")
 
-            time.sleep(CONFIG["SLEEP_BETWEEN_CYCLES_SEC"])
+            self.idle(CONFIG["SLEEP_BETWEEN_CYCLES_SEC"])
+
+        self.mem.log("Agent stopping.")
+        self.orderbook_pool.shutdown(wait=False, cancel_futures=True)
+        self.notify_pool.shutdown(wait=True)
 
 
 if __name__ == "__main__":
@@ -1,12 +1,23 @@
 import os, requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 DISCORD_WEBHOOK = os.getenv("DISCORD_WEBHOOK", "")
 
+# Reused across sends so the webhook host keeps a warm TLS connection
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    # Connection failures only: 5xx replies to a POST are not retried, to avoid duplicate alerts
+    max_retries=Retry(total=2, backoff_factor=0.3),
+))
+
 def send_discord(msg: str):
     if not DISCORD_WEBHOOK:
         print("DISCORD_WEBHOOK not set")
         return
     try:
-        requests.post(DISCORD_WEBHOOK, json={"content": msg}, timeout=10)
+        SESSION.post(DISCORD_WEBHOOK, json={"content": msg}, timeout=10)
     except Exception as e:
         print("Discord send failed:", e)
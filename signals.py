@@ -1,6 +1,7 @@
 # signals.py
 import os
 import time
+from typing import NamedTuple
 
 # Guardrails
 MIN_PRICE = float(os.environ.get("MIN_PRICE", "0.05"))
@@ -27,26 +28,63 @@ def _env_float(key: str, default: float) -> float:
     except Exception:
         return default
 
+class LeagueCfg(NamedTuple):
+    min_snaps: int
+    min_move: float
+    live_cooldown: int
+    pregame_cooldown: int
+
+# Resolved once at import; the hot path only does attribute access
+LEAGUE_CFG = {
+    "NBA": LeagueCfg(
+        min_snaps=_env_int("NBA_MIN_SNAPS", 10),
+        min_move=_env_float("NBA_MIN_MOVE", 0.04),
+        live_cooldown=_env_int("NBA_LIVE_COOLDOWN_SEC", 480),
+        pregame_cooldown=_env_int("NBA_PREGAME_COOLDOWN_SEC", 900),
+    ),
+    "CBB": LeagueCfg(
+        min_snaps=_env_int("CBB_MIN_SNAPS", 12),
+        min_move=_env_float("CBB_MIN_MOVE", 0.05),
+        live_cooldown=_env_int("CBB_LIVE_COOLDOWN_SEC", 600),
+        pregame_cooldown=_env_int("CBB_PREGAME_COOLDOWN_SEC", 900),
+    ),
+}
+
+def league_cfg(league: str) -> LeagueCfg:
+    # Anything that isn't NBA uses the CBB settings
+    if (league or "").upper() == "NBA":
+        return LEAGUE_CFG["NBA"]
+    return LEAGUE_CFG["CBB"]
+
 def min_snaps(league: str) -> int:
-    league = (league or "").upper()
-    if league == "NBA":
-        return _env_int("NBA_MIN_SNAPS", 10)
-    return _env_int("CBB_MIN_SNAPS", 12)
+    return league_cfg(league).min_snaps
 
 def min_move(league: str) -> float:
-    league = (league or "").upper()
-    if league == "NBA":
-        return _env_float("NBA_MIN_MOVE", 0.04)
-    return _env_float("CBB_MIN_MOVE", 0.05)
+    return league_cfg(league).min_move
 
 def cooldown_sec(league: str, is_live: bool) -> int:
-    league = (league or "").upper()
-    if league == "NBA":
-        return _env_int("NBA_LIVE_COOLDOWN_SEC", 480) if is_live else _env_int("NBA_PREGAME_COOLDOWN_SEC", 900)
-    return _env_int("CBB_LIVE_COOLDOWN_SEC", 600) if is_live else _env_int("CBB_PREGAME_COOLDOWN_SEC", 900)
+    cfg = league_cfg(league)
+    return cfg.live_cooldown if is_live else cfg.pregame_cooldown
+
+# Entries older than twice the longest cooldown can never block a send again
+_COOLDOWN_KEEP_SEC = 2 * max(max(c.live_cooldown, c.pregame_cooldown) for c in LEAGUE_CFG.values())
+_SWEEP_EVERY_SEC = 600
+_last_sweep = 0
+
+def _sweep_cooldowns(now: int) -> None:
+    global _last_sweep
+    if now - _last_sweep < _SWEEP_EVERY_SEC:
+        return
+    _last_sweep = now
+    cutoff = now - _COOLDOWN_KEEP_SEC
+    # Snapshot first: another thread's can_send may insert while we scan
+    for k, ts in list(_last_sent.items()):
+        if ts < cutoff:
+            _last_sent.pop(k, None)
 
 def can_send(key: str, league: str, is_live: bool) -> bool:
     now = int(time.time())
+    _sweep_cooldowns(now)
     last = _last_sent.get(key, 0)
     cd = cooldown_sec(league, is_live)
     if now - last < cd:
@@ -1,10 +1,32 @@
 import sqlite3
+import threading
 import time
 
 DB_PATH = "bot.db"
 
+_conn = None
+# The shared connection is used from any thread (check_same_thread=False), so every
+# statement+commit/fetch and the lazy open run under this lock. Re-entrant because
+# the helpers below hold it while calling _db().
+_lock = threading.RLock()
+
 def db():
-    conn = sqlite3.connect(DB_PATH)
+    # Fresh connection owned (and closed) by the caller
+    return _open()
+
+def _db():
+    # One connection for the helpers below; never handed out, so only they can touch it
+    global _conn
+    with _lock:
+        if _conn is None:
+            _conn = _open(check_same_thread=False)
+        return _conn
+
+def _open(check_same_thread=True):
+    conn = sqlite3.connect(DB_PATH, check_same_thread=check_same_thread)
+    # WAL appends each commit instead of rewriting pages through a rollback journal
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
     conn.execute("""
     CREATE TABLE IF NOT EXISTS alerts (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -23,32 +45,32 @@ def db():
         winner TEXT,
         finished_ts INTEGER
     )""")
+    conn.commit()
     return conn
 
 def log_alert(slug, team, side, entry_price, score, period, reason):
-    conn = db()
-    conn.execute(
-        "INSERT INTO alerts (ts, slug, team, side, entry_price, score, period, reason) VALUES (?,?,?,?,?,?,?,?)",
-        (int(time.time()), slug, team, side, float(entry_price), score or "", period or "", reason or "")
-    )
-    conn.commit()
-    conn.close()
+    with _lock:
+        conn = _db()
+        conn.execute(
+            "INSERT INTO alerts (ts, slug, team, side, entry_price, score, period, reason) VALUES (?,?,?,?,?,?,?,?)",
+            (int(time.time()), slug, team, side, float(entry_price), score or "", period or "", reason or "")
+        )
+        conn.commit()
 
 def set_result(slug, winner):
-    conn = db()
-    conn.execute(
-        "INSERT OR REPLACE INTO results (slug, winner, finished_ts) VALUES (?,?,?)",
-        (slug, winner, int(time.time()))
-    )
-    conn.commit()
-    conn.close()
+    with _lock:
+        conn = _db()
+        conn.execute(
+            "INSERT OR REPLACE INTO results (slug, winner, finished_ts) VALUES (?,?,?)",
+            (slug, winner, int(time.time()))
+        )
+        conn.commit()
 
 def get_alerts_for_slug(slug):
-    conn = db()
-    cur = conn.execute(
-        "SELECT ts, team, side, entry_price, score, period, reason FROM alerts WHERE slug=? ORDER BY ts ASC",
-        (slug,)
-    )
-    rows = cur.fetchall()
-    conn.close()
-    return rows
+    with _lock:
+        conn = _db()
+        cur = conn.execute(
+            "SELECT ts, team, side, entry_price, score, period, reason FROM alerts WHERE slug=? ORDER BY ts ASC",
+            (slug,)
+        )
+        return cur.fetchall()